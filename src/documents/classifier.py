@@ -190,11 +190,12 @@ class DocumentClassifier:
             hasher.update(y.to_bytes(4, "little", signed=True))
             labels_correspondent.append(y)
 
+            # Filter in Python, so the prefetched tags are used instead of
+            # issuing another query per document
             tags = sorted(
                 tag.pk
-                for tag in doc.tags.filter(
-                    matching_algorithm=MatchingModel.MATCH_AUTO,
-                )
+                for tag in doc.tags.all()
+                if tag.matching_algorithm == MatchingModel.MATCH_AUTO
             )
             for tag in tags:
                 hasher.update(tag.to_bytes(4, "little", signed=True))
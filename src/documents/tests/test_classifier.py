@@ -251,12 +251,14 @@ class TestClassifier(DirectoriesMixin, TestCase):
             - Classifier training is requested again
         THEN:
             - Classifier does not redo training
+            - Tags are read from the prefetched data, not queried per document
         """
 
         self.generate_test_data()
 
         self.assertTrue(self.classifier.train())
-        self.assertFalse(self.classifier.train())
+        with self.assertNumQueries(5):
+            self.assertFalse(self.classifier.train())
 
     def test_retrain_if_change(self):
         """
@@ -1,14 +1,16 @@
-import os
 import shutil
 from datetime import timedelta
 from pathlib import Path
 from unittest import mock
 
 from django.conf import settings
+from django.db import transaction
+from django.test import SimpleTestCase
 from django.test import TestCase
 from django.utils import timezone
 
 from documents import tasks
+from documents.classifier import DocumentClassifier
 from documents.models import Correspondent
 from documents.models import Document
 from documents.models import DocumentType
@@ -16,67 +18,65 @@ from documents.models import Tag
 from documents.sanity_checker import SanityCheckFailedException
 from documents.sanity_checker import SanityCheckMessages
 from documents.tests.test_classifier import dummy_preprocess
+from documents.tests.utils import ClassDirectoriesMixin
 from documents.tests.utils import DirectoriesMixin
 from documents.tests.utils import FileSystemAssertsMixin
+from documents.tests.utils import create_documents
 
 
-class TestIndexReindex(DirectoriesMixin, TestCase):
-    def test_index_reindex(self):
-        Document.objects.create(
+class TestIndexReindex(ClassDirectoriesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doc = Document.objects.create(
             title="test",
             content="my document",
             checksum="wow",
-            added=timezone.now(),
-            created=timezone.now(),
-            modified=timezone.now(),
         )
 
+    def test_index_reindex(self):
         tasks.index_reindex()
 
     def test_index_optimize(self):
-        Document.objects.create(
-            title="test",
-            content="my document",
-            checksum="wow",
-            added=timezone.now(),
-            created=timezone.now(),
-            modified=timezone.now(),
-        )
-
         tasks.index_optimize()
 
 
 class TestClassifier(DirectoriesMixin, FileSystemAssertsMixin, TestCase):
     @mock.patch("documents.tasks.load_classifier")
-    def test_train_classifier_no_auto_matching(self, load_classifier):
-        tasks.train_classifier()
-        load_classifier.assert_not_called()
-
-    @mock.patch("documents.tasks.load_classifier")
-    def test_train_classifier_with_auto_tag(self, load_classifier):
-        load_classifier.return_value = None
-        Tag.objects.create(matching_algorithm=Tag.MATCH_AUTO, name="test")
-        tasks.train_classifier()
-        load_classifier.assert_called_once()
-        self.assertIsNotFile(settings.MODEL_FILE)
-
-    @mock.patch("documents.tasks.load_classifier")
-    def test_train_classifier_with_auto_type(self, load_classifier):
-        load_classifier.return_value = None
-        DocumentType.objects.create(matching_algorithm=Tag.MATCH_AUTO, name="test")
-        tasks.train_classifier()
-        load_classifier.assert_called_once()
-        self.assertIsNotFile(settings.MODEL_FILE)
-
-    @mock.patch("documents.tasks.load_classifier")
-    def test_train_classifier_with_auto_correspondent(self, load_classifier):
+    def test_train_classifier_auto_matching(self, load_classifier):
+        """
+        GIVEN:
+            - No AUTO matching object, or one AUTO tag, type or correspondent
+        WHEN:
+            - Classifier training task is called
+        THEN:
+            - Classifier is only loaded if there is something AUTO matching
+        """
         load_classifier.return_value = None
-        Correspondent.objects.create(matching_algorithm=Tag.MATCH_AUTO, name="test")
-        tasks.train_classifier()
-        load_classifier.assert_called_once()
-        self.assertIsNotFile(settings.MODEL_FILE)
 
-    def test_train_classifier(self):
+        for model in [None, Tag, DocumentType, Correspondent]:
+            # Each case runs in its own savepoint, so the created object
+            # does not leak into the following cases
+            with self.subTest(model=model), transaction.atomic():
+                load_classifier.reset_mock()
+                if model is not None:
+                    model.objects.create(matching_algorithm=Tag.MATCH_AUTO, name="test")
+
+                tasks.train_classifier()
+
+                if model is None:
+                    load_classifier.assert_not_called()
+                else:
+                    load_classifier.assert_called_once()
+                self.assertIsNotFile(settings.MODEL_FILE)
+
+                transaction.set_rollback(True)
+
+    @mock.patch(
+        "documents.classifier.DocumentClassifier.save",
+        autospec=True,
+        side_effect=DocumentClassifier.save,
+    )
+    def test_train_classifier(self, save_mock):
         c = Correspondent.objects.create(matching_algorithm=Tag.MATCH_AUTO, name="test")
         doc = Document.objects.create(correspondent=c, content="test", title="test")
         self.assertIsNotFile(settings.MODEL_FILE)
@@ -88,22 +88,21 @@ class TestClassifier(DirectoriesMixin, FileSystemAssertsMixin, TestCase):
 
             tasks.train_classifier()
             self.assertIsFile(settings.MODEL_FILE)
-            mtime = os.stat(settings.MODEL_FILE).st_mtime
+            save_mock.assert_called_once()
 
+            # Training data is unchanged, so the model is not written again
             tasks.train_classifier()
             self.assertIsFile(settings.MODEL_FILE)
-            mtime2 = os.stat(settings.MODEL_FILE).st_mtime
-            self.assertEqual(mtime, mtime2)
+            save_mock.assert_called_once()
 
             doc.content = "test2"
             doc.save()
             tasks.train_classifier()
             self.assertIsFile(settings.MODEL_FILE)
-            mtime3 = os.stat(settings.MODEL_FILE).st_mtime
-            self.assertNotEqual(mtime2, mtime3)
+            self.assertEqual(save_mock.call_count, 2)
 
 
-class TestSanityCheck(DirectoriesMixin, TestCase):
+class TestSanityCheck(ClassDirectoriesMixin, SimpleTestCase):
     @mock.patch("documents.tasks.sanity_checker.check_sanity")
     def test_sanity_check_success(self, m):
         m.return_value = SanityCheckMessages()
@@ -142,17 +141,15 @@ class TestSanityCheck(DirectoriesMixin, TestCase):
 
 
 class TestBulkUpdate(DirectoriesMixin, TestCase):
-    def test_bulk_update_documents(self):
-        doc1 = Document.objects.create(
-            title="test",
-            content="my document",
-            checksum="wow",
-            added=timezone.now(),
-            created=timezone.now(),
-            modified=timezone.now(),
-        )
+    @classmethod
+    def setUpTestData(cls):
+        cls.docs = create_documents(100)
 
-        tasks.bulk_update_documents([doc1.pk])
+    def test_bulk_update_documents(self):
+        # One query to load the documents, then the signal handlers and the
+        # index update cost a fixed number of queries per document
+        with self.assertNumQueries(1 + 9 * len(self.docs)):
+            tasks.bulk_update_documents([doc.pk for doc in self.docs])
 
 
 class TestEmptyTrashTask(DirectoriesMixin, FileSystemAssertsMixin, TestCase):
@@ -165,26 +162,30 @@ class TestEmptyTrashTask(DirectoriesMixin, FileSystemAssertsMixin, TestCase):
         - Document is only deleted if it has been in trash for more than delay (default 30 days)
     """
 
-    def test_empty_trash(self):
-        doc = Document.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.doc = Document.objects.create(
             title="test",
             content="my document",
             checksum="wow",
-            added=timezone.now(),
-            created=timezone.now(),
-            modified=timezone.now(),
         )
 
-        doc.delete()
+    def test_empty_trash(self):
+        self.doc.delete()
         self.assertEqual(Document.global_objects.count(), 1)
         self.assertEqual(Document.objects.count(), 0)
-        tasks.empty_trash()
+        with self.assertNumQueries(3):
+            tasks.empty_trash()
         self.assertEqual(Document.global_objects.count(), 1)
 
-        doc.deleted_at = timezone.now() - timedelta(days=31)
-        doc.save()
-
-        tasks.empty_trash()
+        with (
+            mock.patch(
+                "documents.tasks.timezone.now",
+                return_value=timezone.now() + timedelta(days=31),
+            ),
+            self.assertNumQueries(10),
+        ):
+            tasks.empty_trash()
         self.assertEqual(Document.global_objects.count(), 0)
 
 
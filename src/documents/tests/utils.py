@@ -24,6 +24,7 @@ from documents.consumer import ConsumerPlugin
 from documents.data_models import ConsumableDocument
 from documents.data_models import DocumentMetadataOverrides
 from documents.data_models import DocumentSource
+from documents.models import Document
 from documents.parsers import ParseError
 from documents.plugins.helpers import ProgressStatusOptions
 
@@ -87,6 +88,28 @@ def paperless_environment():
             remove_dirs(dirs)
 
 
+def create_documents(count: int, **kwargs) -> list[Document]:
+    """
+    Creates the given number of simple documents using a single bulk insert.
+    Any keyword arguments are passed on to each Document and override the
+    defaults.
+
+    Note: bulk_create does not send the pre_save or post_save signals
+    """
+    documents = [
+        Document(
+            **{
+                "title": f"test {i}",
+                "content": "my document",
+                "checksum": f"checksum{i}",
+                **kwargs,
+            },
+        )
+        for i in range(count)
+    ]
+    return Document.objects.bulk_create(documents, batch_size=500)
+
+
 def util_call_with_backoff(
     method_or_callable: Callable,
     args: list | tuple,
@@ -163,6 +186,24 @@ class DirectoriesMixin:
         remove_dirs(self.dirs)
 
 
+class ClassDirectoriesMixin:
+    """
+    Like DirectoriesMixin, but the folders are only created once for the
+    whole test class.  Only use this if the tests do not depend on the
+    folder contents left behind by another test
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.dirs = setup_directories()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        remove_dirs(cls.dirs)
+
+
 class FileSystemAssertsMixin:
     """
     Utilities for checks various state information of the file system